@@ -8,23 +8,32 @@ and cleaning up nftables rules.
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sys
 from pathlib import Path
 
-from routeguard_core import (
-    RouteGuardError,
-    RouteGuardRunner,
-    build_generated_config_from_wg,
-    check_dependencies,
-    default_logger,
-    ensure_root_if_needed,
-    process_alive,
-    read_state,
-    remove_nft_rules,
-    status_summary,
-)
+# routeguard_core (socket, subprocess, threading, ...) is imported lazily inside
+# the cmd_* handlers so that --help and argument errors stay import-light.
+
+# Top-level help printed by main() without building any parser; keep in sync
+# with parse_args() / SUBPARSER_BUILDERS.
+_STATIC_USAGE = """\
+usage: routeguard-cli [-h] {run,print-config,status,cleanup,stop} ...
+
+Auto-configuring RouteGuard (CLI) for WireGuard configs
+
+positional arguments:
+  {run,print-config,status,cleanup,stop}
+    run                 Run RouteGuard in foreground using generated config
+    print-config        Print generated RouteGuard config and exit
+    status              Show status
+    cleanup             Remove nft rules only
+    stop                Signal running instance (if known) and remove nft
+                        rules
+
+options:
+  -h, --help            show this help message and exit
+"""
 
 
 def eprint(msg: str) -> None:
@@ -32,11 +41,8 @@ def eprint(msg: str) -> None:
     print(msg, file=sys.stderr, flush=True)
 
 
-def parse_args() -> argparse.Namespace:
-    """Build and parse CLI arguments for all supported subcommands."""
-    p = argparse.ArgumentParser(prog='routeguard-cli', description='Auto-configuring RouteGuard (CLI) for WireGuard configs')
-    sub = p.add_subparsers(dest='cmd', required=True)
-
+def build_common_parser() -> argparse.ArgumentParser:
+    """Build the parent parser with WireGuard/config options shared by run and print-config."""
     common = argparse.ArgumentParser(add_help=False)
     common.add_argument('--wg-config', required=True, help='Path to WireGuard .conf')
     common.add_argument('--iface', help='Override VPN interface name (default: infer from file name)')
@@ -44,24 +50,65 @@ def parse_args() -> argparse.Namespace:
     common.add_argument('--interval', type=int, default=5)
     common.add_argument('--no-allow-lan', action='store_true')
     common.add_argument('--no-allow-dhcp', action='store_true')
+    return common
+
 
-    rp = sub.add_parser('run', parents=[common], help='Run RouteGuard in foreground using generated config')
+def build_run_parser(sub) -> None:
+    rp = sub.add_parser('run', parents=[build_common_parser()], help='Run RouteGuard in foreground using generated config')
     rp.add_argument('--up-vpn', action='store_true', help='Run wg-quick up <iface> before starting')
     rp.add_argument('--down-vpn-on-exit', action='store_true')
     rp.add_argument('--no-cleanup', action='store_true', help='Do not remove nft rules on exit')
     rp.add_argument('--save-generated-config', help='Save generated JSON config to file')
     rp.add_argument('--print-generated', action='store_true')
 
-    pp = sub.add_parser('print-config', parents=[common], help='Print generated RouteGuard config and exit')
+
+def build_print_parser(sub) -> None:
+    pp = sub.add_parser('print-config', parents=[build_common_parser()], help='Print generated RouteGuard config and exit')
     pp.add_argument('--save', help='Save generated config to file')
 
+
+def build_status_parser(sub) -> None:
     sub.add_parser('status', help='Show status')
+
+
+def build_cleanup_parser(sub) -> None:
     sub.add_parser('cleanup', help='Remove nft rules only')
+
+
+def build_stop_parser(sub) -> None:
     sub.add_parser('stop', help='Signal running instance (if known) and remove nft rules')
-    return p.parse_args()
+
+
+SUBPARSER_BUILDERS = {
+    'run': build_run_parser,
+    'print-config': build_print_parser,
+    'status': build_status_parser,
+    'cleanup': build_cleanup_parser,
+    'stop': build_stop_parser,
+}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Build and parse CLI arguments.
+
+    Only the subparser named by the first argument is constructed; the full
+    set is built when it is missing, unknown, or a help flag.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    p = argparse.ArgumentParser(prog='routeguard-cli', description='Auto-configuring RouteGuard (CLI) for WireGuard configs')
+    sub = p.add_subparsers(dest='cmd', required=True)
+    builder = SUBPARSER_BUILDERS.get(argv[0]) if argv else None
+    if builder is not None:
+        builder(sub)
+    else:
+        for build in SUBPARSER_BUILDERS.values():
+            build(sub)
+    return p.parse_args(argv)
 
 
 def make_cfg(ns: argparse.Namespace):
+    from routeguard_core import build_generated_config_from_wg
     return build_generated_config_from_wg(
         ns.wg_config,
         mode=ns.mode,
@@ -73,6 +120,7 @@ def make_cfg(ns: argparse.Namespace):
 
 
 def cmd_run(ns: argparse.Namespace) -> int:
+    from routeguard_core import RouteGuardError, RouteGuardRunner, check_dependencies, default_logger, ensure_root_if_needed
     ensure_root_if_needed(ns.mode)
     missing = check_dependencies()
     if missing:
@@ -88,6 +136,7 @@ def cmd_run(ns: argparse.Namespace) -> int:
 
 
 def cmd_print(ns: argparse.Namespace) -> int:
+    from routeguard_core import default_logger
     cfg = make_cfg(ns)
     print(cfg.to_json())
     if ns.save:
@@ -97,8 +146,9 @@ def cmd_print(ns: argparse.Namespace) -> int:
 
 
 def cmd_status() -> int:
+    from routeguard_core import json_dumps, process_alive, status_summary
     st = status_summary()
-    print(json.dumps(st, indent=2, ensure_ascii=False))
+    print(json_dumps(st, indent=True))
     state = st.get('state') or {}
     pid = state.get('pid')
     if pid is not None:
@@ -107,12 +157,14 @@ def cmd_status() -> int:
 
 
 def cmd_cleanup() -> int:
+    from routeguard_core import ensure_root_if_needed, remove_nft_rules
     ensure_root_if_needed('protect')
     remove_nft_rules()
     return 0
 
 
 def cmd_stop() -> int:
+    from routeguard_core import default_logger, ensure_root_if_needed, read_state, remove_nft_rules
     ensure_root_if_needed('protect')
     state = read_state()
     if state and 'pid' in state:
@@ -132,8 +184,15 @@ def cmd_stop() -> int:
 
 def main() -> int:
     """CLI entry point. Returns process exit code."""
+    argv = sys.argv[1:]
+    if not argv:
+        sys.stderr.write(_STATIC_USAGE)
+        return 2
+    if argv[0] in ('-h', '--help', 'help'):
+        sys.stdout.write(_STATIC_USAGE)
+        return 0
     try:
-        ns = parse_args()
+        ns = parse_args(argv)
         if ns.cmd == 'run':
             return cmd_run(ns)
         if ns.cmd == 'print-config':
@@ -144,14 +203,17 @@ def main() -> int:
             return cmd_cleanup()
         if ns.cmd == 'stop':
             return cmd_stop()
-        raise RouteGuardError(f'Unknown command: {ns.cmd}')
+        eprint(f'ERROR: Unknown command: {ns.cmd}')
+        return 1
     except KeyboardInterrupt:
         return 130
-    except RouteGuardError as e:
-        eprint('ERROR: ' + str(e))
-        return 1
     except Exception as e:
-        eprint('UNEXPECTED ERROR: ' + str(e))
+        # A RouteGuardError can only originate from an already-imported core.
+        core = sys.modules.get('routeguard_core')
+        if core is not None and isinstance(e, core.RouteGuardError):
+            eprint('ERROR: ' + str(e))
+        else:
+            eprint('UNEXPECTED ERROR: ' + str(e))
         return 1
 
 
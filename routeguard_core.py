@@ -7,18 +7,28 @@ derived automatically from a WireGuard config and monitoring route table changes
 
 from __future__ import annotations
 
+import functools
+import itertools
 import json
 import os
-import re
+import selectors
 import socket
+import struct
 import subprocess
 import signal
+import sys
 import threading
 import time
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Tuple
+from shutil import which
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson  # optional C accelerator; stdlib json is used when absent
+except ImportError:
+    orjson = None
 
 ROUTEGUARD_TABLE_FAMILY = "inet"
 ROUTEGUARD_TABLE_NAME = "routeguard"
@@ -26,7 +36,49 @@ DEFAULT_INTERVAL = 5
 PRIVATE_V4_CIDRS = ["10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16"]
 PRIVATE_V6_CIDR = "fc00::/7"
 LINK_LOCAL_V6 = ["fe80::/10", "ff00::/8"]
+_PRIVATE_V4_SET = ', '.join(PRIVATE_V4_CIDRS)
+_LINK_LOCAL_V6_SET = ', '.join(LINK_LOCAL_V6)
 STATE_PATHS = [Path("/run/routeguard-auto/state.json"), Path("/tmp/routeguard-auto-state.json")]
+_V4_SPLIT_TARGETS = frozenset({'0.0.0.0/1', '128.0.0.0/1'})
+_V6_SPLIT_TARGETS = frozenset({'::/1', '8000::/1'})
+
+# Prepended to the ruleset so one nft transaction replaces any existing table.
+_NFT_REPLACE_PREFIX = f'add table {ROUTEGUARD_TABLE_FAMILY} {ROUTEGUARD_TABLE_NAME}\ndelete table {ROUTEGUARD_TABLE_FAMILY} {ROUTEGUARD_TABLE_NAME}\n'
+
+# Shared libnftables context: None until first use, False if the binding is unavailable.
+_NFT_LIB = None
+# libnftables contexts are not thread-safe; serializes creation and every cmd() on _NFT_LIB.
+_NFT_LOCK = threading.Lock()
+
+# Commands already found on PATH by command_exists().
+_FOUND_COMMANDS: set = set()
+
+# Parsed WireGuard configs: resolved path -> (stat signature, parsed data).
+_WG_CACHE: Dict[str, Tuple[tuple, dict]] = {}
+
+# dataclass(slots=True) needs Python 3.10+; older interpreters get plain dataclasses.
+_DC_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# rtnetlink constants (linux/netlink.h, linux/rtnetlink.h).
+_NLMSG_ERROR = 2
+_NLMSG_DONE = 3
+_NLM_F_REQUEST = 0x1
+_NLM_F_DUMP = 0x300
+_RTM_NEWLINK = 16
+_RTM_DELLINK = 17
+_RTM_NEWROUTE = 24
+_RTM_GETROUTE = 26
+_RTA_DST = 1
+_RTA_OIF = 4
+_RTA_GATEWAY = 5
+_RTA_TABLE = 15
+_RT_TABLE_MAIN = 254
+_RTMGRP_LINK = 0x1
+_RTMGRP_IPV4_ROUTE = 0x40
+_RTMGRP_IPV6_ROUTE = 0x400
+_NLMSG_HDR = struct.Struct('=IHHII')
+_RTMSG = struct.Struct('=BBBBBBBBI')
+_RTATTR = struct.Struct('=HH')
 
 
 class RouteGuardError(RuntimeError):
@@ -34,6 +86,21 @@ class RouteGuardError(RuntimeError):
     pass
 
 
+def json_dumps_bytes(obj: Any, *, indent: bool=False) -> bytes:
+    """Serialize ``obj`` to UTF-8 JSON, via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def json_dumps(obj: Any, *, indent: bool=False) -> str:
+    return json_dumps_bytes(obj, indent=indent).decode('utf-8')
+
+
+def json_loads(data: str | bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
 def timestamp() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -42,29 +109,46 @@ def default_logger(msg: str) -> None:
     print(f"[{timestamp()}] {msg}", flush=True)
 
 
-@dataclass
+@dataclass(frozen=True, **_DC_SLOTS)
 class EndpointRule:
     ip: str
     port: int
     proto: str = "udp"
+    # nft address family keyword ('ip' or 'ip6'), derived from ip.
+    fam: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'fam', 'ip6' if ':' in self.ip else 'ip')
+
+    def to_dict(self) -> dict:
+        return {'ip': self.ip, 'port': self.port, 'proto': self.proto}
 
+    def nft_line(self) -> str:
+        return f'    {self.fam} daddr {self.ip} {self.proto.lower()} dport {int(self.port)} accept'
 
-@dataclass
+
+@dataclass(frozen=True, **_DC_SLOTS)
 class GeneratedConfig:
     mode: str
     vpn_iface: str
     poll_interval_sec: int = DEFAULT_INTERVAL
     allow_lan: bool = True
     allow_dhcp: bool = True
-    vpn_endpoints: List[EndpointRule] = None
+    vpn_endpoints: List[EndpointRule] = field(default_factory=list)
+    # Derived nft data; frozen so the cached values cannot go stale.
+    _nft_endpoint_lines: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _nft_script: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, '_nft_endpoint_lines', tuple(ep.nft_line() for ep in self.vpn_endpoints))
 
     def to_dict(self) -> dict:
-        d = asdict(self)
-        d["vpn_endpoints"] = [asdict(e) for e in (self.vpn_endpoints or [])]
+        d = {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith('_')}
+        d['vpn_endpoints'] = [e.to_dict() for e in self.vpn_endpoints]
         return d
 
     def to_json(self) -> str:
-        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+        return json_dumps(self.to_dict(), indent=True)
 
 
 def run_cmd(args: List[str], *, check: bool = True, capture_output: bool = True, text: bool = True, input_data: Optional[str] = None) -> subprocess.CompletedProcess:
@@ -72,42 +156,66 @@ def run_cmd(args: List[str], *, check: bool = True, capture_output: bool = True,
 
 
 def command_exists(cmd: str) -> bool:
-    from shutil import which
-    return which(cmd) is not None
+    # Only hits are remembered, so a tool installed while the process runs is found on retry.
+    if cmd in _FOUND_COMMANDS:
+        return True
+    if which(cmd) is None:
+        return False
+    _FOUND_COMMANDS.add(cmd)
+    return True
 
 
 def parse_wireguard_config(path: str) -> dict:
-    """Parse a WireGuard .conf file and return interface/peer sections."""
+    """Parse a WireGuard .conf file and return interface/peer sections.
+
+    Results are memoized per resolved path and revalidated against the file's
+    inode, size, mtime and ctime (which utime cannot reset), so repeated builds
+    from an unchanged file skip the read and parse. Callers get a fresh copy.
+    """
     p = Path(path)
-    if not p.exists():
+    try:
+        st = p.stat()
+    except OSError:
         raise RouteGuardError(f"WireGuard config not found: {path}")
+    cache_key = str(p.resolve())
+    sig = (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+    cached = _WG_CACHE.get(cache_key)
+    if cached is not None and cached[0] == sig:
+        return _copy_wg_data(cached[1])
     interface: Dict[str, str] = {}
     peers: List[Dict[str, str]] = []
-    current_section: Optional[str] = None
-    current_peer: Optional[Dict[str, str]] = None
-    for raw_line in p.read_text(encoding='utf-8').splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith('#') or line.startswith(';'):
+    # Dict receiving key/value lines of the current section (None outside known sections).
+    target: Optional[Dict[str, str]] = None
+    for line in p.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        first = line[0]
+        if first == '#' or first == ';':
             continue
-        if line.startswith('[') and line.endswith(']'):
+        if first == '[' and line[-1] == ']':
             section = line[1:-1].strip().lower()
             if section == 'interface':
-                current_section = 'interface'; current_peer = None
+                target = interface
             elif section == 'peer':
-                current_section = 'peer'; current_peer = {}; peers.append(current_peer)
+                target = {}
+                peers.append(target)
             else:
-                current_section = None; current_peer = None
+                target = None
             continue
-        if '=' not in line:
+        idx = line.find('=')
+        if idx < 0 or target is None:
             continue
-        key, value = [x.strip() for x in line.split('=', 1)]
-        if current_section == 'interface':
-            interface[key] = value
-        elif current_section == 'peer' and current_peer is not None:
-            current_peer[key] = value
+        target[line[:idx].strip()] = line[idx + 1:].strip()
     if not peers:
         raise RouteGuardError('No [Peer] section found in WireGuard config.')
-    return {'interface': interface, 'peers': peers}
+    data = {'interface': interface, 'peers': peers}
+    _WG_CACHE[cache_key] = (sig, data)
+    return _copy_wg_data(data)
+
+
+def _copy_wg_data(data: dict) -> dict:
+    return {'interface': dict(data['interface']), 'peers': [dict(peer) for peer in data['peers']]}
 
 
 def infer_iface_name_from_wg_path(path: str) -> str:
@@ -118,57 +226,66 @@ def infer_iface_name_from_wg_path(path: str) -> str:
 def parse_endpoint(endpoint: str) -> Tuple[str, int]:
     endpoint = endpoint.strip()
     if endpoint.startswith('['):
-        m = re.match(r'^\[(.+)\]:(\d+)$', endpoint)
-        if not m:
+        i = endpoint.rfind(']:')
+        port = endpoint[i + 2:]
+        if i < 2 or not port.isdecimal():
             raise RouteGuardError(f'Invalid endpoint format: {endpoint}')
-        return m.group(1), int(m.group(2))
+        return endpoint[1:i], int(port)
     if endpoint.count(':') == 1:
-        host, port = endpoint.rsplit(':', 1)
-        if not port.isdigit():
+        i = endpoint.find(':')
+        host, port = endpoint[:i], endpoint[i + 1:]
+        if not port.isdecimal():
             raise RouteGuardError(f'Invalid endpoint port: {endpoint}')
         return host, int(port)
     raise RouteGuardError(f'Unsupported endpoint format: {endpoint}')
 
 
 def resolve_host_ips(host: str) -> List[str]:
-    for fam in (socket.AF_INET, socket.AF_INET6):
-        try:
-            socket.inet_pton(fam, host)
-            return [host]
-        except OSError:
-            pass
     try:
-        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_UDP)
-    except socket.gaierror as e:
-        raise RouteGuardError(f"Cannot resolve endpoint host '{host}': {e}") from e
-    ips: List[str] = []
-    for info in infos:
-        ip = info[4][0]
-        if ip not in ips:
-            ips.append(ip)
+        # IP literals resolve without touching DNS.
+        infos = socket.getaddrinfo(host, None, flags=socket.AI_NUMERICHOST, proto=socket.IPPROTO_UDP)
+    except socket.gaierror:
+        try:
+            infos = socket.getaddrinfo(host, None, flags=socket.AI_ADDRCONFIG, proto=socket.IPPROTO_UDP)
+        except socket.gaierror as e:
+            raise RouteGuardError(f"Cannot resolve endpoint host '{host}': {e}") from e
+    ips = list(dict.fromkeys(info[4][0] for info in infos))
     if not ips:
         raise RouteGuardError(f'No IPs resolved for {host}')
     return ips
 
 
-def build_generated_config_from_wg(wg_config_path: str, *, mode: str='monitor', vpn_iface: Optional[str]=None, allow_lan: bool=True, allow_dhcp: bool=True, poll_interval_sec: int=DEFAULT_INTERVAL) -> GeneratedConfig:
-    """Create a normalized RouteGuard configuration from a WireGuard config file."""
+def resolve_wg_endpoints(wg_config_path: str) -> List[EndpointRule]:
+    """Resolve the peer endpoints of a WireGuard config into de-duplicated UDP rules.
+
+    Each host is resolved once per call; answers are never kept across calls so
+    a DDNS endpoint that moves is picked up on the next build.
+    """
     data = parse_wireguard_config(wg_config_path)
-    iface_name = vpn_iface or infer_iface_name_from_wg_path(wg_config_path)
     endpoints: List[EndpointRule] = []
     seen = set()
+    resolved: Dict[str, List[str]] = {}
     for peer in data['peers']:
         ep = peer.get('Endpoint')
         if not ep:
             continue
         host, port = parse_endpoint(ep)
-        for ip in resolve_host_ips(host):
+        if host not in resolved:
+            resolved[host] = resolve_host_ips(host)
+        for ip in resolved[host]:
             key = (ip, int(port), 'udp')
             if key not in seen:
                 seen.add(key)
                 endpoints.append(EndpointRule(ip=ip, port=int(port), proto='udp'))
     if not endpoints:
         raise RouteGuardError('No Peer Endpoint found in WireGuard config.')
+    return endpoints
+
+
+def build_generated_config_from_wg(wg_config_path: str, *, mode: str='monitor', vpn_iface: Optional[str]=None, allow_lan: bool=True, allow_dhcp: bool=True, poll_interval_sec: int=DEFAULT_INTERVAL) -> GeneratedConfig:
+    """Create a normalized RouteGuard configuration from a WireGuard config file."""
+    endpoints = resolve_wg_endpoints(wg_config_path)
+    iface_name = vpn_iface or infer_iface_name_from_wg_path(wg_config_path)
     return GeneratedConfig(mode=mode, vpn_iface=iface_name, poll_interval_sec=max(1, int(poll_interval_sec)), allow_lan=allow_lan, allow_dhcp=allow_dhcp, vpn_endpoints=endpoints)
 
 
@@ -177,7 +294,12 @@ def interface_exists(iface: str) -> bool:
 
 
 def build_nft_script(cfg: GeneratedConfig) -> str:
-    """Build an nftables script implementing a RouteGuard output kill-switch."""
+    """Build an nftables script implementing a RouteGuard output kill-switch.
+
+    The script is deterministic in ``cfg`` and cached on it after the first call.
+    """
+    if cfg._nft_script is not None:
+        return cfg._nft_script
     iface = cfg.vpn_iface.replace('"', '')
     lines = [
         f'table {ROUTEGUARD_TABLE_FAMILY} {ROUTEGUARD_TABLE_NAME} {{',
@@ -185,80 +307,261 @@ def build_nft_script(cfg: GeneratedConfig) -> str:
         '    type filter hook output priority filter; policy accept;',
         '    oifname "lo" accept',
         f'    oifname "{iface}" accept',
-        f"    ip6 daddr {{ {', '.join(LINK_LOCAL_V6)} }} accept",
+        f'    ip6 daddr {{ {_LINK_LOCAL_V6_SET} }} accept',
     ]
     if cfg.allow_dhcp:
         lines += ['    udp sport 68 udp dport 67 accept', '    udp sport 546 udp dport 547 accept']
     if cfg.allow_lan:
-        lines += [f"    ip daddr {{ {', '.join(PRIVATE_V4_CIDRS)} }} accept", f'    ip6 daddr {PRIVATE_V6_CIDR} accept']
-    for ep in (cfg.vpn_endpoints or []):
-        fam = 'ip6' if ':' in ep.ip else 'ip'
-        proto = ep.proto.lower()
-        lines.append(f'    {fam} daddr {ep.ip} {proto} dport {int(ep.port)} accept')
+        lines += [f'    ip daddr {{ {_PRIVATE_V4_SET} }} accept', f'    ip6 daddr {PRIVATE_V6_CIDR} accept']
+    lines.extend(cfg._nft_endpoint_lines)
     lines += [f'    oifname != "{iface}" drop', '  }', '}']
-    return '\n'.join(lines) + '\n'
+    script = '\n'.join(lines) + '\n'
+    object.__setattr__(cfg, '_nft_script', script)
+    return script
+
+
+def _nft_lib():
+    """Return a cached in-process libnftables context, or None to use the nft CLI."""
+    global _NFT_LIB
+    if _NFT_LIB is None:
+        with _NFT_LOCK:
+            if _NFT_LIB is None:
+                try:
+                    from nftables import Nftables
+                    _NFT_LIB = Nftables()
+                except Exception:
+                    _NFT_LIB = False
+    return _NFT_LIB or None
+
+
+def nft_available() -> bool:
+    return _nft_lib() is not None or command_exists('nft')
+
+
+def _nft_run(args: List[str], *, script: Optional[str]=None) -> Tuple[int, str, str]:
+    """Run an nft command via libnftables when possible, else the nft CLI.
+
+    ``args`` are the CLI arguments; ``script`` is fed on stdin (use ``['-f', '-']``).
+    """
+    lib = _nft_lib()
+    if lib is not None:
+        # The GUI's runner thread and button handlers may call in concurrently.
+        with _NFT_LOCK:
+            return lib.cmd(script if script is not None else ' '.join(args))
+    cp = run_cmd(['nft', *args], check=False, input_data=script)
+    return cp.returncode, cp.stdout or '', cp.stderr or ''
 
 
 def routeguard_table_exists() -> bool:
-    return run_cmd(['nft', 'list', 'table', ROUTEGUARD_TABLE_FAMILY, ROUTEGUARD_TABLE_NAME], check=False).returncode == 0 if command_exists('nft') else False
+    return _nft_run(['list', 'table', ROUTEGUARD_TABLE_FAMILY, ROUTEGUARD_TABLE_NAME])[0] == 0 if nft_available() else False
 
 
 def apply_nft_rules(cfg: GeneratedConfig, logger: Callable[[str], None]=default_logger) -> None:
     """Apply RouteGuard nftables rules for the provided generated config."""
-    if not command_exists('nft'):
+    if not nft_available():
         raise RouteGuardError('nft command not found. Install nftables.')
-    # Remove previous ruleset safely (ignored if table is absent).
-    remove_nft_rules(logger=lambda _msg: None)
-    script = build_nft_script(cfg)
-    cp = run_cmd(['nft', '-f', '-'], check=False, input_data=script)
-    if cp.returncode != 0:
-        err = (cp.stderr or cp.stdout or '').strip()
+    # Replace any previous ruleset atomically in the same transaction.
+    rc, out, err = _nft_run(['-f', '-'], script=_NFT_REPLACE_PREFIX + build_nft_script(cfg))
+    if rc != 0:
+        err = (err or out or '').strip()
         raise RouteGuardError(f'nft failed to apply rules: {err or "unknown error"}')
     if not routeguard_table_exists():
         raise RouteGuardError('Failed to apply nft rules (table inet routeguard missing).')
-    logger(f"Applied nftables rules for iface '{cfg.vpn_iface}' ({len(cfg.vpn_endpoints or [])} endpoint rule(s)).")
+    logger(f"Applied nftables rules for iface '{cfg.vpn_iface}' ({len(cfg.vpn_endpoints)} endpoint rule(s)).")
 
 
 def remove_nft_rules(logger: Callable[[str], None]=default_logger) -> None:
     """Remove the RouteGuard nftables table if it exists."""
-    if not command_exists('nft'):
+    if not nft_available():
         return
-    cp = run_cmd(['nft', 'delete', 'table', ROUTEGUARD_TABLE_FAMILY, ROUTEGUARD_TABLE_NAME], check=False)
-    if cp.returncode == 0:
+    rc, _out, _err = _nft_run(['delete', 'table', ROUTEGUARD_TABLE_FAMILY, ROUTEGUARD_TABLE_NAME])
+    if rc == 0:
         logger('Removed nftables table inet routeguard.')
     else:
         logger('nftables table inet routeguard was not present (nothing to remove).')
 
 
-def ip_json_routes(ipv6: bool=False) -> List[dict]:
+@functools.lru_cache(maxsize=64)
+def _ifname(index: int) -> str:
+    """Interface name for a netlink ifindex; cleared on link add/remove notifications.
+
+    Raises OSError for an unknown index, so failures are never cached.
+    """
+    return socket.if_indextoname(index)
+
+
+def _netlink_routes(ipv6: bool=False) -> List[dict]:
+    """Dump the main routing table via rtnetlink RTM_GETROUTE.
+
+    Returns dicts with the ``dst``/``dev``/``gateway`` keys used by ``ip -j route``.
+    Raises OSError if netlink is unavailable.
+    """
+    family = socket.AF_INET6 if ipv6 else socket.AF_INET
+    max_len = 128 if ipv6 else 32
+    routes: List[dict] = []
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+        sock.settimeout(2.0)
+        sock.bind((0, 0))
+        seq = int(time.time()) & 0xFFFFFFFF
+        body = _RTMSG.pack(family, 0, 0, 0, 0, 0, 0, 0, 0)
+        sock.send(_NLMSG_HDR.pack(_NLMSG_HDR.size + len(body), _RTM_GETROUTE, _NLM_F_REQUEST | _NLM_F_DUMP, seq, 0) + body)
+        while True:
+            data = sock.recv(65536)
+            off = 0
+            while off + _NLMSG_HDR.size <= len(data):
+                msg_len, msg_type, _flags, msg_seq, _pid = _NLMSG_HDR.unpack_from(data, off)
+                if msg_len < _NLMSG_HDR.size:
+                    return routes
+                end = off + msg_len
+                if msg_seq != seq:
+                    off = (end + 3) & ~3
+                    continue
+                if msg_type == _NLMSG_DONE:
+                    return routes
+                if msg_type == _NLMSG_ERROR:
+                    errno = -struct.unpack_from('=i', data, off + _NLMSG_HDR.size)[0]
+                    raise OSError(errno, 'netlink RTM_GETROUTE failed')
+                if msg_type == _RTM_NEWROUTE:
+                    rtm_family, dst_len, _src, _tos, table, _proto, _scope, _type, _rflags = _RTMSG.unpack_from(data, off + _NLMSG_HDR.size)
+                    attrs: Dict[int, bytes] = {}
+                    a = off + _NLMSG_HDR.size + _RTMSG.size
+                    while a + _RTATTR.size <= end:
+                        rta_len, rta_type = _RTATTR.unpack_from(data, a)
+                        if rta_len < _RTATTR.size:
+                            break
+                        attrs[rta_type] = data[a + _RTATTR.size:a + rta_len]
+                        a += (rta_len + 3) & ~3
+                    if _RTA_TABLE in attrs:
+                        table = struct.unpack('=I', attrs[_RTA_TABLE])[0]
+                    if rtm_family == family and table == _RT_TABLE_MAIN:
+                        route: dict = {}
+                        if _RTA_DST in attrs:
+                            ip = socket.inet_ntop(family, attrs[_RTA_DST])
+                            route['dst'] = ip if dst_len == max_len else f'{ip}/{dst_len}'
+                        else:
+                            route['dst'] = 'default'
+                        if _RTA_GATEWAY in attrs:
+                            route['gateway'] = socket.inet_ntop(family, attrs[_RTA_GATEWAY])
+                        if _RTA_OIF in attrs:
+                            oif = struct.unpack('=I', attrs[_RTA_OIF])[0]
+                            try:
+                                route['dev'] = _ifname(oif)
+                            except OSError:
+                                route['dev'] = str(oif)
+                        routes.append(route)
+                off = (end + 3) & ~3
+
+
+def _route_monitor_socket() -> Optional[socket.socket]:
+    """Open a non-blocking netlink socket subscribed to IPv4/IPv6 route and link changes."""
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    except OSError:
+        return None
+    try:
+        sock.bind((0, _RTMGRP_LINK | _RTMGRP_IPV4_ROUTE | _RTMGRP_IPV6_ROUTE))
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _drain(fd: int) -> None:
+    """Read and discard everything pending on a non-blocking fd."""
+    try:
+        while os.read(fd, 4096):
+            pass
+    except BlockingIOError:
+        pass
+
+
+def _drain_route_events(sock: socket.socket) -> None:
+    """Discard pending netlink notifications, resetting the ifname cache on link changes."""
+    while True:
+        try:
+            data = sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            # ENOBUFS: notifications were dropped, so assume links may have changed.
+            _ifname.cache_clear()
+            return
+        off = 0
+        while off + _NLMSG_HDR.size <= len(data):
+            msg_len, msg_type = _NLMSG_HDR.unpack_from(data, off)[:2]
+            if msg_type == _RTM_NEWLINK or msg_type == _RTM_DELLINK:
+                _ifname.cache_clear()
+            if msg_len < _NLMSG_HDR.size:
+                break
+            off += (msg_len + 3) & ~3
+
+
+def _ip_route_args(ipv6: bool) -> List[str]:
     args = ['ip', '-j']
     if ipv6:
         args.append('-6')
-    args += ['route', 'show', 'table', 'main']
-    cp = run_cmd(args, check=False)
-    if cp.returncode != 0:
-        return []
+    return args + ['route', 'show', 'table', 'main']
+
+
+def _parse_ip_json(out: Optional[str]) -> List[dict]:
     try:
-        data = json.loads(cp.stdout or '[]')
+        data = json_loads(out or '[]')
         return data if isinstance(data, list) else []
     except Exception:
         return []
 
 
+def _route_dumps(families: Tuple[bool, ...]) -> List[List[dict]]:
+    """Dump main-table routes per family (``True`` = IPv6), via netlink when possible.
+
+    The ``ip -j route`` fallback starts one process per family and runs them concurrently.
+    """
+    try:
+        return [_netlink_routes(v6) for v6 in families]
+    except OSError:
+        pass
+    procs = [subprocess.Popen(_ip_route_args(v6), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) for v6 in families]
+    results = []
+    for proc in procs:
+        out, _ = proc.communicate()
+        results.append(_parse_ip_json(out) if proc.returncode == 0 else [])
+    return results
+
+
+def ip_json_routes(ipv6: bool=False) -> List[dict]:
+    """Return main-table routes, via netlink when possible, else ``ip -j route``."""
+    return _route_dumps((ipv6,))[0]
+
+
+def ip_json_routes_all() -> Tuple[List[dict], List[dict]]:
+    """Return (IPv4, IPv6) main-table routes in one call."""
+    v4, v6 = _route_dumps((False, True))
+    return v4, v6
+
+
 def suspicious_routes(routes: List[dict], vpn_iface: str, ipv6: bool=False) -> List[str]:
     """Detect split-default routes routed via a non-VPN interface."""
-    targets = {'::/1', '8000::/1'} if ipv6 else {'0.0.0.0/1', '128.0.0.0/1'}
+    targets = _V6_SPLIT_TARGETS if ipv6 else _V4_SPLIT_TARGETS
     out: List[str] = []
     for r in routes:
         dst = r.get('dst')
-        dev = r.get('dev') or r.get('oif') or ''
-        if dst in targets and dev and dev != vpn_iface:
+        if dst not in targets:
+            continue
+        dev = r.get('dev') or r.get('oif')
+        if dev and dev != vpn_iface:
             out.append(f"{dst} via dev={dev} gateway={r.get('gateway', '-')}")
     return out
 
 
 def check_dependencies(require_tk: bool=False) -> List[str]:
-    missing = [cmd for cmd in ('ip', 'nft') if not command_exists(cmd)]
+    global _NFT_LIB
+    if _NFT_LIB is False:
+        # Retry the libnftables import in case python3-nftables was installed since.
+        _NFT_LIB = None
+    missing = [] if command_exists('ip') else ['ip']
+    if not nft_available():
+        missing.append('nft')
     if require_tk:
         try:
             import tkinter  # noqa: F401
@@ -303,7 +606,7 @@ def write_state(cfg: GeneratedConfig, extra: Optional[dict]=None) -> Path:
     payload = {'pid': os.getpid(), 'started_at': timestamp(), 'config': cfg.to_dict()}
     if extra:
         payload.update(extra)
-    p.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+    p.write_bytes(json_dumps_bytes(payload, indent=True))
     return p
 
 
@@ -311,7 +614,7 @@ def read_state() -> Optional[dict]:
     for p in STATE_PATHS:
         if p.exists():
             try:
-                return json.loads(p.read_text(encoding='utf-8'))
+                return json_loads(p.read_bytes())
             except Exception:
                 return None
     return None
@@ -344,14 +647,25 @@ class RouteGuardRunner:
         self.cleanup_nft_on_exit = cleanup_nft_on_exit
         self.stop_event = threading.Event()
         self._signal_installed = False
+        self._wake_lock = threading.Lock()
+        self._stop_w: Optional[int] = None
+        self._prev_wakeup_fd: Optional[int] = None
+        self._route_events = False
 
     def request_stop(self) -> None:
         self.stop_event.set()
+        with self._wake_lock:
+            if self._stop_w is not None:
+                try:
+                    os.write(self._stop_w, b'\0')
+                except OSError:
+                    pass
 
     def _install_signals(self) -> None:
         if threading.current_thread() is not threading.main_thread() or self._signal_installed:
             return
         def _handler(signum, frame):
+            # The monitor selector is woken via signal.set_wakeup_fd, not from here.
             self.logger(f'Signal {signum} received, stopping...')
             self.stop_event.set()
         signal.signal(signal.SIGINT, _handler)
@@ -366,11 +680,58 @@ class RouteGuardRunner:
             time.sleep(0.5)
         raise RouteGuardError(f"VPN interface '{self.cfg.vpn_iface}' not found.")
 
+    def _open_wakeup(self) -> selectors.BaseSelector:
+        """Create the selector the monitor loop blocks on: stop pipe plus route-change socket."""
+        sel = selectors.DefaultSelector()
+        r, w = os.pipe()
+        os.set_blocking(r, False)
+        os.set_blocking(w, False)
+        sel.register(r, selectors.EVENT_READ)
+        with self._wake_lock:
+            self._stop_w = w
+        if threading.current_thread() is threading.main_thread():
+            # SIGINT/SIGTERM write their number into the stop pipe at C level.
+            self._prev_wakeup_fd = signal.set_wakeup_fd(w)
+        route_sock = _route_monitor_socket()
+        self._route_events = route_sock is not None
+        if route_sock is not None:
+            sel.register(route_sock, selectors.EVENT_READ)
+        else:
+            self.logger('Route change notifications unavailable, polling only.')
+        return sel
+
+    def _close_wakeup(self, sel: selectors.BaseSelector) -> None:
+        if self._prev_wakeup_fd is not None:
+            signal.set_wakeup_fd(self._prev_wakeup_fd)
+            self._prev_wakeup_fd = None
+        with self._wake_lock:
+            w, self._stop_w = self._stop_w, None
+        for key in list(sel.get_map().values()):
+            sel.unregister(key.fileobj)
+            if isinstance(key.fileobj, socket.socket):
+                key.fileobj.close()
+            else:
+                os.close(key.fileobj)
+        sel.close()
+        if w is not None:
+            os.close(w)
+
+    def _wait_for_change(self, sel: selectors.BaseSelector) -> None:
+        """Block until a route changes, stop is requested, or the poll interval elapses."""
+        for key, _events in sel.select(timeout=self.cfg.poll_interval_sec):
+            if isinstance(key.fileobj, socket.socket):
+                _drain_route_events(key.fileobj)
+            else:
+                _drain(key.fileobj)
+        if not self._route_events:
+            # No link notifications to invalidate cached ifindex names: refresh every poll.
+            _ifname.cache_clear()
+
     def run(self) -> int:
         """Run the monitoring/protection loop until stop is requested."""
         self._install_signals()
         self.logger(f"RouteGuard starting: mode={self.cfg.mode}, iface={self.cfg.vpn_iface}, interval={self.cfg.poll_interval_sec}s")
-        self.logger('Endpoints: ' + ', '.join([f"{e.ip}:{e.port}/{e.proto}" for e in (self.cfg.vpn_endpoints or [])]))
+        self.logger('Endpoints: ' + ', '.join([f"{e.ip}:{e.port}/{e.proto}" for e in self.cfg.vpn_endpoints]))
         try:
             if self.auto_up_vpn:
                 wg_quick_up(self.cfg.vpn_iface, self.logger)
@@ -387,19 +748,23 @@ class RouteGuardRunner:
                 raise RouteGuardError(f'Unknown mode: {self.cfg.mode}')
             statep = write_state(self.cfg)
             self.logger(f'State file: {statep}')
-            warned = set()
-            while not self.stop_event.is_set():
-                if self.cfg.mode == 'protect' and not routeguard_table_exists():
-                    self.logger('WARNING: nft table missing, re-applying rules.')
-                    apply_nft_rules(self.cfg, self.logger)
-                current = set(suspicious_routes(ip_json_routes(False), self.cfg.vpn_iface, False) + suspicious_routes(ip_json_routes(True), self.cfg.vpn_iface, True))
-                for msg in sorted(current - warned):
-                    self.logger('ALERT suspicious route detected: ' + msg)
-                warned = current
-                for _ in range(max(1, int(self.cfg.poll_interval_sec * 10))):
-                    if self.stop_event.is_set():
-                        break
-                    time.sleep(0.1)
+            warned = frozenset()
+            sel = self._open_wakeup()
+            try:
+                while not self.stop_event.is_set():
+                    if self.cfg.mode == 'protect' and not routeguard_table_exists():
+                        self.logger('WARNING: nft table missing, re-applying rules.')
+                        apply_nft_rules(self.cfg, self.logger)
+                    v4_routes, v6_routes = ip_json_routes_all()
+                    # Ordered de-duplication: alerts are reported in route dump order.
+                    current = dict.fromkeys(itertools.chain(suspicious_routes(v4_routes, self.cfg.vpn_iface, False), suspicious_routes(v6_routes, self.cfg.vpn_iface, True)))
+                    for msg in current:
+                        if msg not in warned:
+                            self.logger('ALERT suspicious route detected: ' + msg)
+                    warned = current.keys()
+                    self._wait_for_change(sel)
+            finally:
+                self._close_wakeup(sel)
             self.logger('Stopping RouteGuard...')
             return 0
         finally:
@@ -6,20 +6,24 @@ preview, logs, and controls for start/stop/status/cleanup operations.
 """
 from __future__ import annotations
 
-import json
+import collections
+import dataclasses
 import math
 import os
-import queue
+import sys
 import threading
 import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
+from typing import Callable
 
 from routeguard_core import (
     RouteGuardRunner,
     build_generated_config_from_wg,
     check_dependencies,
+    json_dumps,
     remove_nft_rules,
+    resolve_wg_endpoints,
     status_summary,
 )
 
@@ -130,36 +134,73 @@ I18N = {
         "footer_text": "Доступны CLI и GUI версии",
     },
 }
+for _lang in I18N:
+    I18N[_lang] = {sys.intern(k): v for k, v in I18N[_lang].items()}
+del _lang
 
 
 class RouteGuardGUI(tk.Tk):
     """Main application window for RouteGuard GUI control panel."""
 
+    # Pulse phase advance per second (0.16 rad per 120 ms frame).
+    _ANIM_RATE = 0.16 / 0.12
+    # 64-step sine table indexed by int(phase * _SIN_STEPS_PER_RAD) & 63.
+    _SIN_LUT = tuple(math.sin(2 * math.pi * i / 64) for i in range(64))
+    _SIN_STEPS_PER_RAD = 64 / (2 * math.pi)
+    # Rolling window for the Logs widget: once it exceeds MAX lines, trim to KEEP.
+    _LOG_MAX_LINES = 5000
+    _LOG_KEEP_LINES = 4000
+    # Max log messages handled per drain before yielding back to the Tk event loop.
+    _LOG_DRAIN_BATCH = 200
+    # (base, glow) colors of the pulsing status dot; other kinds are not animated.
+    _PULSE_COLORS = {
+        'running': ('#2e8b57', '#8fd4ae'),
+        'warn': ('#b7791f', '#e7c27a'),
+        'error': ('#c14d4d', '#efb1b1'),
+    }
+
     def __init__(self):
         super().__init__()
         self.lang = tk.StringVar(value='ru')
-        self.title(I18N[self.lang.get()]["app_title"])
+        self._load_strings()
+        self.title(self._strings["app_title"])
         self.geometry('1120x780')
         self.minsize(980, 680)
 
-        self.log_q: 'queue.Queue[str]' = queue.Queue()
+        # Single-producer/single-consumer log channel: deque append/popleft are
+        # atomic, and old lines are dropped if the UI stalls. Session end is
+        # signalled separately so an overflow can never drop it.
+        self.log_q: 'collections.deque[str]' = collections.deque(maxlen=4096)
+        self._drain_scheduled = threading.Event()
+        self._session_ended = threading.Event()
         self.runner = None
         self.worker = None
-        self._txt_widgets: dict[str, list[tuple[object, str]]] = {}
+        self._cfg_cache_key = None
+        self._cfg_cache_val = None
+        # Flat (setter, i18n key) list; each setter applies translated text to one widget or tab.
+        self._txt_targets: list[tuple[Callable[[str], object], str]] = []
         self._status_kind = 'idle'  # idle/running/error/warn
         self._running_dots = 0
-        self._anim_t = 0.0
+        self._anim_t0 = time.monotonic()
+        self._anim_after_id = None
 
         self._setup_style()
         self._init_vars()
         self._build_ui()
         self._apply_i18n()
-        self.after(120, self._pump_logs)
-        self.after(80, self._animate)
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def tr(self, key: str) -> str:
-        return I18N.get(self.lang.get(), I18N['en']).get(key, key)
+        return self._strings.get(key, key)
+
+    def _load_strings(self):
+        """Select the active language table and cache strings used on hot paths."""
+        self._strings = strings = I18N.get(self.lang.get(), I18N['en'])
+        self._tr_running = strings.get('status_running', 'status_running')
+        self._tr_stopping = strings.get('status_stopping', 'status_stopping')
+        self._tr_nft_present = strings.get('status_nft_present', 'status_nft_present')
+        self._tr_nft_error = strings.get('status_nft_error', 'status_nft_error')
+        self._tr_status_prefix = strings.get('status_label', 'status_label') + ':\n'
 
     def _setup_style(self):
         style = ttk.Style(self)
@@ -169,7 +210,7 @@ class RouteGuardGUI(tk.Tk):
             pass
 
         # light beige / white minimalist palette
-        self._colors = {
+        self._colors = {k: sys.intern(v) for k, v in {
             'bg': '#f6f2ea',          # warm background
             'panel': '#fffdf8',       # cards
             'panel_alt': '#f0e9dd',   # soft beige
@@ -184,40 +225,54 @@ class RouteGuardGUI(tk.Tk):
             'warning': '#b7791f',
             'shadow': '#efe7db',
             'log_bg': '#fbfaf6',
-        }
+        }.items()}
         c = self._colors
         self.configure(bg=c['bg'])
+        # (dot, pill background, pill foreground) per status kind.
+        self._state_palette = {
+            'idle': (c['muted'], c['panel_alt'], c['muted']),
+            'running': (c['success'], '#dff3e7', c['success']),
+            'warn': (c['warning'], '#f7edd8', c['warning']),
+            'error': (c['danger'], '#f8e6e6', c['danger']),
+        }
+        # Quantized base->glow color ramps for the pulsing status dot.
+        self._pulse_ramps = {
+            kind: [self._mix_hex(base, glow, i / 31) for i in range(32)]
+            for kind, (base, glow) in self._PULSE_COLORS.items()
+        }
 
-        style.configure('.', background=c['bg'], foreground=c['text'], fieldbackground=c['surface'])
-        style.configure('TFrame', background=c['bg'])
-        style.configure('Card.TFrame', background=c['panel'], relief='flat', borderwidth=1)
-        style.configure('CardInner.TFrame', background=c['panel'])
-        style.configure('Header.TLabel', background=c['bg'], foreground=c['text'], font=('TkDefaultFont', 16, 'bold'))
-        style.configure('Muted.TLabel', background=c['bg'], foreground=c['muted'])
-        style.configure('CardTitle.TLabel', background=c['panel'], foreground=c['text'], font=('TkDefaultFont', 10, 'bold'))
-        style.configure('TLabel', background=c['bg'], foreground=c['text'])
-
-        style.configure('Field.TEntry', fieldbackground=c['surface'], foreground=c['text'], insertcolor=c['text'],
-                        bordercolor=c['border'], lightcolor=c['border'], darkcolor=c['border'])
-        style.configure('Field.TCombobox', fieldbackground=c['surface'], foreground=c['text'],
-                        bordercolor=c['border'], lightcolor=c['border'], darkcolor=c['border'])
-        style.map('Field.TCombobox', fieldbackground=[('readonly', c['surface'])], foreground=[('readonly', c['text'])])
-
-        style.configure('Soft.TCheckbutton', background=c['panel'], foreground=c['text'])
-        style.map('Soft.TCheckbutton', background=[('active', c['panel'])], foreground=[('active', c['text'])])
-
-        style.configure('TNotebook', background=c['bg'], borderwidth=0)
-        style.configure('TNotebook.Tab', background=c['panel_alt'], foreground=c['muted'], padding=(14, 8), borderwidth=0)
-        style.map('TNotebook.Tab',
-                  background=[('selected', c['panel'])],
-                  foreground=[('selected', c['text'])])
-
-        style.configure('Primary.TButton', background=c['accent'], foreground='white', padding=(12, 9), borderwidth=0)
-        style.map('Primary.TButton', background=[('active', '#2957b5')])
-        style.configure('Neutral.TButton', background=c['surface'], foreground=c['text'], padding=(10, 9), borderwidth=1)
-        style.map('Neutral.TButton', background=[('active', '#f5f1ea')])
-        style.configure('Danger.TButton', background='#f6eaea', foreground=c['danger'], padding=(10, 9), borderwidth=1)
-        style.map('Danger.TButton', background=[('active', '#f3e0e0')])
+        # All style options go to Tcl as one 'ttk::style theme settings' script.
+        style.theme_settings(style.theme_use(), {
+            '.': {'configure': dict(background=c['bg'], foreground=c['text'], fieldbackground=c['surface'])},
+            'TFrame': {'configure': dict(background=c['bg'])},
+            'Card.TFrame': {'configure': dict(background=c['panel'], relief='flat', borderwidth=1)},
+            'CardInner.TFrame': {'configure': dict(background=c['panel'])},
+            'Header.TLabel': {'configure': dict(background=c['bg'], foreground=c['text'], font=('TkDefaultFont', 16, 'bold'))},
+            'Muted.TLabel': {'configure': dict(background=c['bg'], foreground=c['muted'])},
+            'CardTitle.TLabel': {'configure': dict(background=c['panel'], foreground=c['text'], font=('TkDefaultFont', 10, 'bold'))},
+            'TLabel': {'configure': dict(background=c['bg'], foreground=c['text'])},
+
+            'Field.TEntry': {'configure': dict(fieldbackground=c['surface'], foreground=c['text'], insertcolor=c['text'],
+                                               bordercolor=c['border'], lightcolor=c['border'], darkcolor=c['border'])},
+            'Field.TCombobox': {'configure': dict(fieldbackground=c['surface'], foreground=c['text'],
+                                                  bordercolor=c['border'], lightcolor=c['border'], darkcolor=c['border']),
+                                'map': dict(fieldbackground=[('readonly', c['surface'])], foreground=[('readonly', c['text'])])},
+
+            'Soft.TCheckbutton': {'configure': dict(background=c['panel'], foreground=c['text']),
+                                  'map': dict(background=[('active', c['panel'])], foreground=[('active', c['text'])])},
+
+            'TNotebook': {'configure': dict(background=c['bg'], borderwidth=0)},
+            'TNotebook.Tab': {'configure': dict(background=c['panel_alt'], foreground=c['muted'], padding=(14, 8), borderwidth=0),
+                              'map': dict(background=[('selected', c['panel'])],
+                                          foreground=[('selected', c['text'])])},
+
+            'Primary.TButton': {'configure': dict(background=c['accent'], foreground='white', padding=(12, 9), borderwidth=0),
+                                'map': dict(background=[('active', '#2957b5')])},
+            'Neutral.TButton': {'configure': dict(background=c['surface'], foreground=c['text'], padding=(10, 9), borderwidth=1),
+                                'map': dict(background=[('active', '#f5f1ea')])},
+            'Danger.TButton': {'configure': dict(background='#f6eaea', foreground=c['danger'], padding=(10, 9), borderwidth=1),
+                               'map': dict(background=[('active', '#f3e0e0')])},
+        })
 
     def _init_vars(self):
         self.wg_path = tk.StringVar(value='/etc/wireguard/wg0.conf')
@@ -230,32 +285,24 @@ class RouteGuardGUI(tk.Tk):
         self.auto_down = tk.BooleanVar(value=False)
         self.cleanup_nft = tk.BooleanVar(value=True)
         self.status_var = tk.StringVar(value='Idle')
+        self._last_status_text = 'Idle'
 
     def _bind_text(self, key: str, widget, attr: str = 'text'):
-        self._txt_widgets.setdefault(key, []).append((widget, attr))
-
-    def _set_text(self, widget, attr: str, value: str):
-        try:
-            widget.configure(**{attr: value})
-        except Exception:
-            if attr == 'title' and hasattr(widget, 'configure'):
-                try:
-                    widget.configure(text=value)
-                except Exception:
-                    pass
+        if attr.startswith('tab:'):
+            setter = lambda txt, nb=widget, idx=int(attr[4:]): nb.tab(idx, text=txt)
+        else:
+            setter = lambda txt, w=widget, a=attr: w.configure(**{a: txt})
+        self._txt_targets.append((setter, key))
 
     def _apply_i18n(self):
-        self.title(self.tr('app_title'))
-        for key, targets in self._txt_widgets.items():
-            txt = self.tr(key)
-            for widget, attr in targets:
-                if isinstance(widget, ttk.Notebook) and attr.startswith('tab:'):
-                    widget.tab(int(attr.split(':', 1)[1]), text=txt)
-                else:
-                    self._set_text(widget, attr, txt)
+        self._load_strings()
+        strings = self._strings
+        self.title(strings.get('app_title', 'app_title'))
+        for setter, key in self._txt_targets:
+            setter(strings.get(key, key))
         self.mode_box.configure(values=['monitor', 'protect'])
         if self._status_kind == 'idle':
-            self.status_var.set(self.tr('status_idle'))
+            self._set_status_text(self.tr('status_idle'))
         self._set_state_dot(self._status_kind)
 
     def _card(self, parent, row, col, title_key, padx=(0, 0), pady=(0, 0), rowspan=1, colspan=1, sticky='nsew'):
@@ -312,26 +359,30 @@ class RouteGuardGUI(tk.Tk):
         setup_wrap.grid_columnconfigure(1, weight=1)
 
         pad_y = 6
-        tk.Label(setup_wrap, text='', bg=c['panel'], fg=c['text']).grid(row=0, column=0, sticky='w', pady=pad_y)
-        self._bind_text('wg_config', setup_wrap.grid_slaves(row=0, column=0)[0])
+        wg_config_lbl = tk.Label(setup_wrap, text='', bg=c['panel'], fg=c['text'])
+        wg_config_lbl.grid(row=0, column=0, sticky='w', pady=pad_y)
+        self._bind_text('wg_config', wg_config_lbl)
         self.wg_entry = ttk.Entry(setup_wrap, textvariable=self.wg_path, style='Field.TEntry')
         self.wg_entry.grid(row=1, column=0, columnspan=2, sticky='ew', pady=(0, pad_y))
         self.browse_btn = ttk.Button(setup_wrap, style='Neutral.TButton', command=self._browse)
         self.browse_btn.grid(row=1, column=2, sticky='e', padx=(8, 0), pady=(0, pad_y))
         self._bind_text('browse', self.browse_btn)
 
-        tk.Label(setup_wrap, text='', bg=c['panel'], fg=c['text']).grid(row=2, column=0, sticky='w', pady=pad_y)
-        self._bind_text('iface_override', setup_wrap.grid_slaves(row=2, column=0)[0])
+        iface_override_lbl = tk.Label(setup_wrap, text='', bg=c['panel'], fg=c['text'])
+        iface_override_lbl.grid(row=2, column=0, sticky='w', pady=pad_y)
+        self._bind_text('iface_override', iface_override_lbl)
         self.iface_entry = ttk.Entry(setup_wrap, textvariable=self.iface, style='Field.TEntry')
         self.iface_entry.grid(row=3, column=0, columnspan=2, sticky='ew', pady=(0, pad_y))
 
-        tk.Label(setup_wrap, text='', bg=c['panel'], fg=c['text']).grid(row=4, column=0, sticky='w', pady=pad_y)
-        self._bind_text('mode', setup_wrap.grid_slaves(row=4, column=0)[0])
+        mode_lbl = tk.Label(setup_wrap, text='', bg=c['panel'], fg=c['text'])
+        mode_lbl.grid(row=4, column=0, sticky='w', pady=pad_y)
+        self._bind_text('mode', mode_lbl)
         self.mode_box = ttk.Combobox(setup_wrap, textvariable=self.mode, values=['monitor', 'protect'], width=14, state='readonly', style='Field.TCombobox')
         self.mode_box.grid(row=5, column=0, sticky='w', pady=(0, pad_y))
 
-        tk.Label(setup_wrap, text='', bg=c['panel'], fg=c['text']).grid(row=4, column=1, sticky='w', padx=(10, 0), pady=pad_y)
-        self._bind_text('interval', setup_wrap.grid_slaves(row=4, column=1)[0])
+        interval_lbl = tk.Label(setup_wrap, text='', bg=c['panel'], fg=c['text'])
+        interval_lbl.grid(row=4, column=1, sticky='w', padx=(10, 0), pady=pad_y)
+        self._bind_text('interval', interval_lbl)
         self.interval_entry = ttk.Entry(setup_wrap, textvariable=self.interval, width=10, style='Field.TEntry')
         self.interval_entry.grid(row=5, column=1, sticky='w', padx=(10, 0), pady=(0, pad_y))
 
@@ -426,60 +477,81 @@ class RouteGuardGUI(tk.Tk):
             relief='flat', borderwidth=0, padx=10, pady=10
         )
         self.preview.grid(row=0, column=0, sticky='nsew')
-        self.preview.insert('1.0', self.tr('placeholder') + '\n')
-        self.preview.configure(state='disabled')
+        self._txt_insert_bulk(self.preview, self.tr('placeholder') + '\n')
+
+        # The Logs text widget is created on first display; lines logged before
+        # that are buffered in _pending_logs, capped like the widget itself.
+        self.notebook = notebook
+        self._logs_tab = logs_tab
+        self.logs = None
+        self._pending_logs: 'collections.deque[str]' = collections.deque(maxlen=self._LOG_KEEP_LINES)
+        notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+
+        self._set_status(self.tr('status_idle'), kind='idle')
+        self._log(self.tr('ready'))
 
+    def _on_tab_changed(self, _event=None):
+        if self.notebook.select() == str(self._logs_tab):
+            self._ensure_logs_widget()
+
+    def _ensure_logs_widget(self):
+        if self.logs is not None:
+            return self.logs
+        c = self._colors
         self.logs = scrolledtext.ScrolledText(
-            logs_tab, height=18, wrap='word', bg=c['log_bg'], fg=c['text'], insertbackground=c['text'],
+            self._logs_tab, height=18, wrap='word', bg=c['log_bg'], fg=c['text'], insertbackground=c['text'],
             relief='flat', borderwidth=0, padx=10, pady=10
         )
         self.logs.grid(row=0, column=0, sticky='nsew')
-        self.logs.configure(state='disabled')
-
-        self._set_status(self.tr('status_idle'), kind='idle')
-        self._log(self.tr('ready'))
+        self._txt_insert_bulk(self.logs, ''.join(self._pending_logs), max_lines=self._LOG_MAX_LINES, keep_lines=self._LOG_KEEP_LINES)
+        self._pending_logs.clear()
+        self.logs.see('end')
+        return self.logs
 
     def _set_state_dot(self, kind: str):
-        c = self._colors
         self._status_kind = kind
-        palette = {
-            'idle': (c['muted'], c['panel_alt'], c['muted']),
-            'running': (c['success'], '#dff3e7', c['success']),
-            'warn': (c['warning'], '#f7edd8', c['warning']),
-            'error': (c['danger'], '#f8e6e6', c['danger']),
-        }
-        dot, pill_bg, pill_fg = palette.get(kind, palette['idle'])
+        dot, pill_bg, pill_fg = self._state_palette.get(kind, self._state_palette['idle'])
         self.status_dot.itemconfig(self.status_oval, fill=dot)
         self.status_pill.configure(bg=pill_bg, fg=pill_fg)
+        # Only animated kinds keep the 120 ms animation timer alive.
+        if kind in self._PULSE_COLORS:
+            if self._anim_after_id is None:
+                self._anim_after_id = self.after(80, self._animate)
+        elif self._anim_after_id is not None:
+            self.after_cancel(self._anim_after_id)
+            self._anim_after_id = None
 
     def _set_status(self, text: str, kind: str | None = None):
         if kind is not None:
             self._set_state_dot(kind)
-        self.status_var.set(text)
+        self._set_status_text(text)
+
+    def _set_status_text(self, text: str):
+        # StringVar.set fires a Tcl trace and label relayout even for identical text.
+        if text != self._last_status_text:
+            self._last_status_text = text
+            self.status_var.set(text)
 
     def _animate(self):
         # Minimal animation: pulse the status dot and animate dots while running/stopping
-        self._anim_t += 0.16
+        # Phase from the monotonic clock: no accumulated drift, and late frames don't slow the pulse.
+        step = (time.monotonic() - self._anim_t0) * (self._ANIM_RATE * self._SIN_STEPS_PER_RAD)
         kind = self._status_kind
-        if kind in ('running', 'warn'):
-            pulse = 0.55 + 0.45 * (0.5 + 0.5 * math.sin(self._anim_t))
-            base = {'running': '#2e8b57', 'warn': '#b7791f'}[kind]
-            glow = {'running': '#8fd4ae', 'warn': '#e7c27a'}[kind]
-            fill = self._mix_hex(base, glow, pulse)
-            self.status_dot.itemconfig(self.status_oval, fill=fill)
-        elif kind == 'error':
+        if kind not in self._PULSE_COLORS:
+            self._anim_after_id = None
+            return
+        if kind == 'error':
             # subtle pulse for error too, slower visual emphasis
-            pulse = 0.25 + 0.25 * (0.5 + 0.5 * math.sin(self._anim_t * 0.6))
-            fill = self._mix_hex('#c14d4d', '#efb1b1', pulse)
-            self.status_dot.itemconfig(self.status_oval, fill=fill)
+            pulse = 0.25 + 0.25 * (0.5 + 0.5 * self._SIN_LUT[int(step * 0.6) & 63])
         else:
-            self.status_dot.itemconfig(self.status_oval, fill=self._colors['muted'])
+            pulse = 0.55 + 0.45 * (0.5 + 0.5 * self._SIN_LUT[int(step) & 63])
+        self.status_dot.itemconfig(self.status_oval, fill=self._pulse_ramps[kind][int(pulse * 31)])
 
         if kind in ('running', 'warn'):
-            base = self.tr('status_running') if kind == 'running' else self.tr('status_stopping')
+            label = self._tr_running if kind == 'running' else self._tr_stopping
             self._running_dots = (self._running_dots + 1) % 4
-            self.status_var.set(base + '.' * self._running_dots)
-        self.after(120, self._animate)
+            self._set_status_text(label + '.' * self._running_dots)
+        self._anim_after_id = self.after(120, self._animate)
 
     @staticmethod
     def _mix_hex(a: str, b: str, t: float) -> str:
@@ -496,6 +568,8 @@ class RouteGuardGUI(tk.Tk):
 
     @property
     def logs_empty(self) -> bool:
+        if self.logs is None:
+            return not self._pending_logs
         try:
             return self.logs.index('end-1c') == '1.0'
         except Exception:
@@ -508,55 +582,117 @@ class RouteGuardGUI(tk.Tk):
             self._set_status(os.path.basename(p), kind='idle')
 
     def _log(self, msg: str):
-        self.logs.configure(state='normal')
+        self._log_lines([msg])
+
+    def _log_lines(self, msgs: list[str]):
+        # One insert/see per batch keeps bursts to a single text-widget update.
         ts = time.strftime('%H:%M:%S')
-        self.logs.insert('end', f'[{ts}] {msg.rstrip()}\n')
+        if self.logs is None:
+            self._pending_logs.extend(f'[{ts}] {m.rstrip()}\n' for m in msgs)
+            return
+        text = ''.join(f'[{ts}] {m.rstrip()}\n' for m in msgs)
+        self._txt_insert_bulk(self.logs, text, max_lines=self._LOG_MAX_LINES, keep_lines=self._LOG_KEEP_LINES)
         self.logs.see('end')
-        self.logs.configure(state='disabled')
 
-    def _enqueue_log(self, msg: str):
-        self.log_q.put(msg)
+    @staticmethod
+    def _txt_insert_bulk(widget, text: str, *, replace: bool = False, max_lines: int | None = None, keep_lines: int = 0):
+        """Write text into a read-only Text widget with a single state toggle.
 
-    def _pump_logs(self):
+        With max_lines, the oldest lines are dropped down to keep_lines once the
+        widget grows past max_lines.
+        """
+        widget.configure(state='normal')
         try:
-            while True:
-                msg = self.log_q.get_nowait()
-                if msg == '__RG_UI__STOPPED__':
-                    self._set_status(self.tr('status_idle'), kind='idle')
-                    self._log('RouteGuard session ended.')
-                    continue
-                self._log(msg)
-                m = msg.lower()
-                if m.startswith('error:'):
-                    self._set_status(self.tr('status_nft_error'), kind='error')
-                elif 'applied nftables rules' in m:
-                    self._set_status(self.tr('status_nft_present'), kind='running')
-        except queue.Empty:
-            pass
-        self.after(120, self._pump_logs)
+            if replace:
+                widget.delete('1.0', 'end')
+            widget.insert('end', text)
+            if max_lines is not None:
+                line_count = int(widget.index('end-1c').split('.')[0])
+                if line_count > max_lines:
+                    widget.delete('1.0', f'{line_count - keep_lines}.0')
+        finally:
+            widget.configure(state='disabled')
 
-    def _cfg(self):
+    def _enqueue_log(self, msg: str):
+        # May run on the runner thread: queue the message and schedule at most
+        # one drain per burst on the Tk event loop.
+        self.log_q.append(msg)
+        self._schedule_drain()
+
+    def _schedule_drain(self):
+        if not self._drain_scheduled.is_set():
+            self._drain_scheduled.set()
+            try:
+                self.after_idle(self._drain_logs)
+            except (RuntimeError, tk.TclError):
+                # Window already destroyed; don't leave a drain marked as pending.
+                self._drain_scheduled.clear()
+
+    def _drain_logs(self):
+        self._drain_scheduled.clear()
+        batch: list[str] = []
+        for _ in range(self._LOG_DRAIN_BATCH):
+            try:
+                msg = self.log_q.popleft()
+            except IndexError:
+                break
+            batch.append(msg)
+            m = msg.lower()
+            if m.startswith('error:'):
+                self._set_status(self._tr_nft_error, kind='error')
+            elif 'applied nftables rules' in m:
+                self._set_status(self._tr_nft_present, kind='running')
+        # The worker sets the flag after its last log line, so handle it once the channel is empty.
+        if not self.log_q and self._session_ended.is_set():
+            self._session_ended.clear()
+            self._set_status(self.tr('status_idle'), kind='idle')
+            batch.append('RouteGuard session ended.')
+        if batch:
+            self._log_lines(batch)
+        if self.log_q and not self._drain_scheduled.is_set():
+            # More pending: continue on a later idle pass so input and redraws get a turn.
+            self._drain_scheduled.set()
+            self.after_idle(self._drain_logs)
+
+    def _cfg(self, *, fresh=False):
+        wg = self.wg_path.get().strip()
+        iface = self.iface.get().strip() or None
+        interval_raw = (self.interval.get() or '5').strip()
         try:
-            interval = int((self.interval.get() or '5').strip())
+            st = os.stat(wg)
+            file_sig = (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        except OSError:
+            file_sig = None
+        # Reuse the last config (e.g. Preview then Start) while inputs and the file are unchanged.
+        key = (wg, file_sig, iface, self.mode.get(), interval_raw, self.allow_lan.get(), self.allow_dhcp.get())
+        if file_sig is not None and key == self._cfg_cache_key:
+            cfg = self._cfg_cache_val
+            if fresh:
+                # Re-resolve endpoint hosts only, so a moved DDNS address is picked up;
+                # the cached config (and its nft script) is kept when nothing changed.
+                endpoints = resolve_wg_endpoints(wg)
+                if endpoints != cfg.vpn_endpoints:
+                    cfg = self._cfg_cache_val = dataclasses.replace(cfg, vpn_endpoints=endpoints)
+            return cfg
+        try:
+            interval = int(interval_raw)
         except ValueError:
             raise ValueError('Interval must be an integer / Интервал должен быть целым числом')
-        return build_generated_config_from_wg(
-            self.wg_path.get().strip(),
+        cfg = build_generated_config_from_wg(
+            wg,
             mode=self.mode.get(),
-            vpn_iface=(self.iface.get().strip() or None),
+            vpn_iface=iface,
             allow_lan=self.allow_lan.get(),
             allow_dhcp=self.allow_dhcp.get(),
             poll_interval_sec=interval,
         )
+        self._cfg_cache_key, self._cfg_cache_val = key, cfg
+        return cfg
 
     def preview_config(self):
         try:
             cfg = self._cfg()
-            text = cfg.to_json()
-            self.preview.configure(state='normal')
-            self.preview.delete('1.0', 'end')
-            self.preview.insert('1.0', text)
-            self.preview.configure(state='disabled')
+            self._txt_insert_bulk(self.preview, cfg.to_json(), replace=True)
             self._log(self.tr('generated_updated'))
             self._set_status(self.tr('status_preview_ok'), kind='idle')
         except Exception as e:
@@ -573,7 +709,7 @@ class RouteGuardGUI(tk.Tk):
             self._set_status(self.tr('missing_deps_title'), kind='error')
             return
         try:
-            cfg = self._cfg()
+            cfg = self._cfg(fresh=True)
         except Exception as e:
             messagebox.showerror(self.tr('config_error_title'), str(e))
             self._set_status(self.tr('config_error_title'), kind='error')
@@ -596,7 +732,8 @@ class RouteGuardGUI(tk.Tk):
             except Exception as e:
                 self._enqueue_log('ERROR: ' + str(e))
             finally:
-                self.log_q.put('__RG_UI__STOPPED__')
+                self._session_ended.set()
+                self._schedule_drain()
 
         self.worker = threading.Thread(target=_work, daemon=True)
         self.worker.start()
@@ -613,9 +750,9 @@ class RouteGuardGUI(tk.Tk):
     def show_status(self):
         try:
             st = status_summary()
-            self._log(self.tr('status_label') + ':\n' + json.dumps(st, indent=2, ensure_ascii=False))
+            self._log(self._tr_status_prefix + json_dumps(st, indent=True))
             present = bool(st.get('routeguard_nft_table_present'))
-            self._set_status(self.tr('status_nft_present') if present else self.tr('status_nft_absent'),
+            self._set_status(self._tr_nft_present if present else self.tr('status_nft_absent'),
                              kind='running' if present else 'idle')
         except Exception as e:
             self._log('Status error: ' + str(e))